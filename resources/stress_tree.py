@@ -0,0 +1,114 @@
+# Generated by scripts/model.py. Do not edit.
+import numpy as np
+
+
+def predict(model_input):
+    # scikit-learn casts X to float32 before comparing. The inputs are
+    # already float32, so comparing them in float64 gives the same result
+    # without rounding the float64 thresholds
+    X = np.asarray(model_input, dtype=np.float64)
+    return np.where(
+        X[:, 2] <= 79.5,
+        np.where(
+            X[:, 6] <= 5.0950000286102295,
+            np.where(
+                X[:, 2] <= 47.5,
+                np.where(
+                    X[:, 7] <= -0.2500000074505806,
+                    1,
+                    np.where(
+                        X[:, 8] <= 0.5,
+                        0,
+                        1,
+                    ),
+                ),
+                np.where(
+                    X[:, 2] <= 76.5,
+                    1,
+                    np.where(
+                        X[:, 6] <= 4.414999961853027,
+                        1,
+                        0,
+                    ),
+                ),
+            ),
+            np.where(
+                X[:, 7] <= 1.3499999642372131,
+                np.where(
+                    X[:, 4] <= 394.9385070800781,
+                    np.where(
+                        X[:, 6] <= 7.014999866485596,
+                        0,
+                        0,
+                    ),
+                    1,
+                ),
+                np.where(
+                    X[:, 3] <= 83.48518371582031,
+                    np.where(
+                        X[:, 2] <= 54.5,
+                        0,
+                        0,
+                    ),
+                    1,
+                ),
+            ),
+        ),
+        np.where(
+            X[:, 7] <= 1.550000011920929,
+            np.where(
+                X[:, 6] <= 6.4649999141693115,
+                np.where(
+                    X[:, 1] <= 38.21309280395508,
+                    0,
+                    np.where(
+                        X[:, 3] <= 41.264726638793945,
+                        1,
+                        1,
+                    ),
+                ),
+                np.where(
+                    X[:, 3] <= 59.32555389404297,
+                    np.where(
+                        X[:, 0] <= 22.4662446975708,
+                        1,
+                        0,
+                    ),
+                    np.where(
+                        X[:, 5] <= 18.0,
+                        1,
+                        1,
+                    ),
+                ),
+            ),
+            np.where(
+                X[:, 6] <= 5.944999933242798,
+                np.where(
+                    X[:, 2] <= 113.5,
+                    np.where(
+                        X[:, 3] <= 68.2671127319336,
+                        0,
+                        1,
+                    ),
+                    np.where(
+                        X[:, 0] <= 30.923542976379395,
+                        1,
+                        0,
+                    ),
+                ),
+                np.where(
+                    X[:, 3] <= 50.66758918762207,
+                    np.where(
+                        X[:, 6] <= 8.894999980926514,
+                        0,
+                        1,
+                    ),
+                    np.where(
+                        X[:, 1] <= 59.25838851928711,
+                        1,
+                        0,
+                    ),
+                ),
+            ),
+        ),
+    )
@@ -1,7 +1,10 @@
-from src.app import lambda_handler
 import os
 
+# Must be set before importing the app, since the config is read on import
 os.environ["RUNNING_LOCALLY"] = "True"
+
+from src.app import lambda_handler
+
 # --- Example of how to run this locally (for testing) ---
 if __name__ == "__main__":
     # This block will only run when you execute the script directly
@@ -0,0 +1,20 @@
+import onnxruntime as rt
+
+MODEL_FILE_NAME = "resources/stress_model.onnx"
+ORT_MODEL_FILE_NAME = "resources/stress_model.ort"
+
+# --- Save the Model in ORT Format ---
+# The ORT format is a flatbuffer that ONNX Runtime can load without parsing
+# protobuf, and it already holds the fully optimized graph. Like
+# `scripts/optimize_model.py`, run this in the deployment environment, since
+# the optimizations can be specific to the ONNX Runtime version and CPU.
+print(f"Converting '{MODEL_FILE_NAME}' to ORT format...")
+sess_options = rt.SessionOptions()
+sess_options.graph_optimization_level = rt.GraphOptimizationLevel.ORT_ENABLE_ALL
+sess_options.optimized_model_filepath = ORT_MODEL_FILE_NAME
+sess_options.add_session_config_entry("session.save_model_format", "ORT")
+rt.InferenceSession(
+    MODEL_FILE_NAME, sess_options=sess_options, providers=["CPUExecutionProvider"]
+)
+print(f"ORT format model saved to '{ORT_MODEL_FILE_NAME}'")
+print(f"Load it by setting MODEL_FILE_NAME={ORT_MODEL_FILE_NAME}")
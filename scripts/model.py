@@ -108,7 +108,61 @@ if ONNX_AVAILABLE:
     print(f"Model successfully converted and saved to '{onnx_filename}'")
 
 
-# --- 8. Example of How to Use the Models (This part goes in your Lambda) ---
+# --- 8. Export the Tree Arrays for the Native Evaluator ---
+# The fitted tree is saved as flat arrays so the Lambda can evaluate it with
+# a compiled kernel (see src/tree.py) instead of an ONNX session.
+tree_filename = "stress_tree.npz"
+np.savez(
+    tree_filename,
+    feature=model.tree_.feature,
+    threshold=model.tree_.threshold,
+    children_left=model.tree_.children_left,
+    children_right=model.tree_.children_right,
+    leaf_class=model.classes_[np.argmax(model.tree_.value, axis=2).ravel()],
+)
+print(f"Tree arrays successfully saved to '{tree_filename}'")
+
+
+# --- 9. Generate a Specialized Python Predictor ---
+# The tree is also written out as a single nested np.where expression with
+# the thresholds inlined as constants, so it can be evaluated without the
+# ONNX runtime or any tree traversal (loaded by _load_generated_model in
+# src/services.py for MODEL_BACKEND=codegen).
+def generate_tree_source(node, indent):
+    """Returns the np.where expression for the subtree rooted at `node`."""
+    tree = model.tree_
+    if tree.children_left[node] == -1:
+        return str(int(model.classes_[np.argmax(tree.value[node])]))
+    padding = " " * (indent + 4)
+    left_source = generate_tree_source(tree.children_left[node], indent + 4)
+    right_source = generate_tree_source(tree.children_right[node], indent + 4)
+    return (
+        f"np.where(\n"
+        f"{padding}X[:, {tree.feature[node]}] <= {float(tree.threshold[node])!r},\n"
+        f"{padding}{left_source},\n"
+        f"{padding}{right_source},\n"
+        f"{' ' * indent})"
+    )
+
+
+generated_tree_filename = "stress_tree.py"
+with open(generated_tree_filename, "w") as f:
+    f.write(
+        "# Generated by scripts/model.py. Do not edit.\n"
+        "import numpy as np\n"
+        "\n"
+        "\n"
+        "def predict(model_input):\n"
+        "    # scikit-learn casts X to float32 before comparing. The inputs are\n"
+        "    # already float32, so comparing them in float64 gives the same result\n"
+        "    # without rounding the float64 thresholds\n"
+        "    X = np.asarray(model_input, dtype=np.float64)\n"
+        f"    return {generate_tree_source(0, 4)}\n"
+    )
+print(f"Generated predictor successfully saved to '{generated_tree_filename}'")
+
+
+# --- 10. Example of How to Use the Models (This part goes in your Lambda) ---
 print("\n--- Example Predictions for a New Student ---")
 
 # Simulate new data for a single student (as if it came from the uploaded CSV)
@@ -0,0 +1,19 @@
+import onnxruntime as rt
+
+MODEL_FILE_NAME = "resources/stress_model.onnx"
+OPTIMIZED_MODEL_FILE_NAME = "resources/stress_model.opt.onnx"
+
+# --- Save the Optimized Graph ---
+# Creating a session with 'optimized_model_filepath' makes ONNX Runtime write
+# the fully optimized graph to disk, so production can skip that work at load.
+# Run this in the deployment environment: the output can contain optimizations
+# specific to the ONNX Runtime version and CPU it was produced on.
+print(f"Optimizing '{MODEL_FILE_NAME}'...")
+sess_options = rt.SessionOptions()
+sess_options.graph_optimization_level = rt.GraphOptimizationLevel.ORT_ENABLE_ALL
+sess_options.optimized_model_filepath = OPTIMIZED_MODEL_FILE_NAME
+rt.InferenceSession(
+    MODEL_FILE_NAME, sess_options=sess_options, providers=["CPUExecutionProvider"]
+)
+print(f"Optimized model saved to '{OPTIMIZED_MODEL_FILE_NAME}'")
+print(f"Load it by setting MODEL_FILE_NAME={OPTIMIZED_MODEL_FILE_NAME}")
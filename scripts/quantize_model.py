@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# ONNX-related imports (quantization also needs the 'onnx' package)
+try:
+    import onnxruntime as rt
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+except ImportError:
+    print("Error: 'onnx' or 'onnxruntime' not found.")
+    print("Install them with: pip install onnx onnxruntime")
+    exit()
+
+FP32_MODEL_FILE_NAME = "resources/stress_model.onnx"
+INT8_MODEL_FILE_NAME = "resources/stress_model.int8.onnx"
+DATASET_FILE_NAME = "resources/university_mental_health_iot_dataset.csv"
+
+NUMERICAL_FEATURES = [
+    "temperature_celsius",
+    "humidity_percent",
+    "air_quality_index",
+    "noise_level_db",
+    "lighting_lux",
+    "crowd_density",
+    "sleep_hours",
+    "mood_score",
+]
+
+
+class StressDataReader(CalibrationDataReader):
+    """Feeds the dataset to static quantization one batch at a time."""
+
+    def __init__(self, input_name, model_input, batch_size=100):
+        self.batches = iter(
+            [
+                {input_name: model_input[i : i + batch_size]}
+                for i in range(0, len(model_input), batch_size)
+            ]
+        )
+
+    def get_next(self):
+        return next(self.batches, None)
+
+
+def predict(model_file_name, model_input):
+    """Returns the labels predicted by the given model."""
+    sess = rt.InferenceSession(model_file_name)
+    input_name = sess.get_inputs()[0].name
+    label_name = sess.get_outputs()[0].name
+    return sess.run([label_name], {input_name: model_input})[0]
+
+
+# --- 1. Prepare the Validation Data ---
+# Use the same feature engineering as the training script.
+df = pd.read_csv(DATASET_FILE_NAME)
+location_dummies = pd.get_dummies(df["location_id"], prefix="location_id", dtype=float)
+X = pd.concat([df[NUMERICAL_FEATURES], location_dummies], axis=1)
+model_input = X.to_numpy(dtype=np.float32)
+fp32_predictions = predict(FP32_MODEL_FILE_NAME, model_input)
+
+# --- 2. Quantize the Model Weights to INT8 ---
+print(f"Quantizing '{FP32_MODEL_FILE_NAME}' to INT8...")
+quantize_dynamic(
+    FP32_MODEL_FILE_NAME, INT8_MODEL_FILE_NAME, weight_type=QuantType.QInt8
+)
+print(f"Quantized model saved to '{INT8_MODEL_FILE_NAME}'")
+
+# --- 3. Compare the Predictions of Both Models ---
+# The quantized model must not be shipped unless it agrees with the original.
+agreement = np.mean(fp32_predictions == predict(INT8_MODEL_FILE_NAME, model_input))
+print(f"Prediction agreement between FP32 and INT8 models: {agreement:.4f}")
+
+# --- 4. Fall Back to Static Quantization ---
+# Static quantization calibrates activation ranges on the dataset, which can
+# recover accuracy that dynamic quantization loses.
+if agreement < 1.0:
+    print("Dynamic quantization changes predictions. Trying static quantization...")
+    input_name = rt.InferenceSession(FP32_MODEL_FILE_NAME).get_inputs()[0].name
+    quantize_static(
+        FP32_MODEL_FILE_NAME,
+        INT8_MODEL_FILE_NAME,
+        StressDataReader(input_name, model_input),
+        weight_type=QuantType.QInt8,
+    )
+    agreement = np.mean(fp32_predictions == predict(INT8_MODEL_FILE_NAME, model_input))
+    print(f"Prediction agreement after static quantization: {agreement:.4f}")
+
+if agreement < 1.0:
+    print("Warning: the quantized model changes predictions. Review before shipping.")
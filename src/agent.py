@@ -1,5 +1,6 @@
 import time
-import json
+import orjson
+from src.utils import dumps
 from src.processing import load_and_filter_data, run_inference, store_predictions
 
 
@@ -19,16 +20,18 @@ class Agent:
         self.trace.append(log_entry)
         print(f"[AGENT LOG] {message}")
 
-    def run(self, file_path):
+    def run(self, file_path, file_obj=None):
         """
-        Executes the agent's main loop to process a file.
+        Executes the agent's main loop to process a file. If `file_obj` is
+        given the data is streamed from it, and `file_path` only names the
+        source file.
         """
         self._log("Agent run started.", {"file_path": file_path})
 
         try:
             # --- Action 1: Load and Filter Data ---
             self._log("Initiating action: Load and filter data.")
-            filtered_df = load_and_filter_data(file_path)
+            filtered_df = load_and_filter_data(file_path, file_obj)
 
             if filtered_df is None:
                 self._log("Observation: Data loading failed. Halting run.")
@@ -54,7 +57,7 @@ class Agent:
             )
 
             # --- Action 3: Store Predictions ---
-            if predictions_to_store:
+            if not predictions_to_store.empty:
                 self._log("Initiating action: Store predictions in DynamoDB.")
                 items_inserted = store_predictions(predictions_to_store, file_path)
                 self._log(
@@ -69,5 +72,5 @@ class Agent:
         finally:
             self._log("Agent run finished.")
             print("--- Agent Trace ---")
-            print(json.dumps(self.trace, indent=2))
+            print(dumps(self.trace, option=orjson.OPT_INDENT_2))
             print("-------------------")
@@ -1,14 +1,17 @@
-import os
-import json
 import logging
-from datetime import datetime
-from boto3.dynamodb.conditions import Key
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import agent and other components
 from src.agent import Agent
-from src.services import table, s3_client, sess
-from src.config import RUNNING_LOCALLY, LOCAL_CSV_FILE_NAME
-from src.utils import DecimalEncoder
+from src.services import get_table, get_dynamodb_client, get_s3_client, get_model
+from src.utils import deserialize_item, dumps
+from src.config import (
+    RUNNING_LOCALLY,
+    LOCAL_CSV_FILE_NAME,
+    SQS_MAX_WORKERS,
+    DYNAMODB_TABLE_NAME,
+)
 
 # Configure logger
 logging.basicConfig(
@@ -26,7 +29,7 @@ def get_alerts(event):
             logging.warning("API request missing 'source_file' query parameter.")
             return {
                 "statusCode": 400,
-                "body": json.dumps(
+                "body": dumps(
                     {"error": "The 'source_file' query parameter is required."}
                 ),
             }
@@ -36,14 +39,21 @@ def get_alerts(event):
         logging.info(f"Querying DynamoDB for all alerts with PK: {pk_to_query}")
 
         all_items = []
+        # Only fetch the attributes used to build the response. The low-level
+        # client returns raw attribute values, which are deserialized without
+        # going through Decimal.
         query_kwargs = {
-            "KeyConditionExpression": Key("PK").eq(pk_to_query),
+            "TableName": DYNAMODB_TABLE_NAME,
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": {"S": pk_to_query}},
+            "ProjectionExpression": "SourceFile, #TS, OriginalStressLevel",
+            "ExpressionAttributeNames": {"#TS": "Timestamp"},
         }
 
         # Loop until all pages are fetched
         while True:
-            response = table.query(**query_kwargs)
-            all_items.extend(response.get("Items", []))
+            response = get_dynamodb_client().query(**query_kwargs)
+            all_items.extend(deserialize_item(item) for item in response["Items"])
 
             # Check if there are more items to fetch
             last_evaluated_key = response.get("LastEvaluatedKey")
@@ -57,88 +67,111 @@ def get_alerts(event):
             f"Found a total of {len(all_items)} items for the given source file."
         )
 
-        # Process all fetched items
-        alerts = []
-        for item in all_items:
-            try:
-                dt_object = datetime.strptime(item["Timestamp"], "%Y-%m-%d %H:%M:%S")
-                iso_timestamp = dt_object.isoformat() + "Z"
-            except (KeyError, ValueError):
-                iso_timestamp = None
-                logging.warning(f"Could not parse timestamp for item: {item.get('SK')}")
-
-            alerts.append(
-                {
-                    "record_id": item.get("SourceFile", "unknown-source"),
-                    "stress_score": int(item.get("OriginalStressLevel", 0)),
-                    "timestamp": iso_timestamp,
-                }
-            )
+        # Stored timestamps are always "%Y-%m-%d %H:%M:%S", so they can be
+        # turned into ISO 8601 strings without parsing them
+        alerts = [
+            {
+                "record_id": item.get("SourceFile", "unknown-source"),
+                "stress_score": int(item.get("OriginalStressLevel", 0)),
+                "timestamp": (
+                    item["Timestamp"].replace(" ", "T") + "Z"
+                    if "Timestamp" in item
+                    else None
+                ),
+            }
+            for item in all_items
+        ]
 
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"alerts": alerts}, cls=DecimalEncoder),
+            "body": dumps({"alerts": alerts}),
         }
     except Exception as e:
         logging.error("Error processing GET /alerts request.", exc_info=True)
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": "Could not retrieve alerts."}),
+            "body": dumps({"error": "Could not retrieve alerts."}),
         }
 
 
+def process_sqs_record(record):
+    """Processes every S3 object referenced by a single SQS record."""
+    s3_event_str = record.get("body", "{}")
+    s3_event = orjson.loads(s3_event_str)
+    for s3_record in s3_event.get("Records", []):
+        s3_bucket = s3_record["s3"]["bucket"]["name"]
+        s3_key = s3_record["s3"]["object"]["key"]
+
+        # Stream the object straight into the CSV reader instead of
+        # downloading it to /tmp first
+        logging.info(f"Streaming s3://{s3_bucket}/{s3_key}")
+        s3_object = get_s3_client().get_object(Bucket=s3_bucket, Key=s3_key)
+
+        # Instantiate and run the agent for the streamed file
+        agent = Agent()
+        agent.run(file_path=s3_key, file_obj=s3_object["Body"])
+
+
 def handle_sqs_event(event):
-    """Handles the SQS event trigger from S3 by using the Agent."""
-    logging.info(f"Received {len(event.get('Records', []))} SQS records to process.")
-    for record in event.get("Records", []):
-        try:
-            s3_event_str = record.get("body", "{}")
-            s3_event = json.loads(s3_event_str)
-            for s3_record in s3_event.get("Records", []):
-                s3_bucket = s3_record["s3"]["bucket"]["name"]
-                s3_key = s3_record["s3"]["object"]["key"]
-
-                download_path = f"/tmp/{os.path.basename(s3_key)}"
-                logging.info(
-                    f"Downloading s3://{s3_bucket}/{s3_key} to {download_path}"
+    """
+    Handles the SQS event trigger from S3 by using the Agent. Records are
+    processed concurrently since the work is dominated by S3 and DynamoDB
+    I/O, which releases the GIL.
+    """
+    records = event.get("Records", [])
+    logging.info(f"Received {len(records)} SQS records to process.")
+    if not records:
+        return
+
+    # The S3 client and every model backend are safe to call from several
+    # threads (the Numba tree kernel is serial for this reason). The shared
+    # DynamoDB table is only used to create a separate batch writer per file.
+    max_workers = min(SQS_MAX_WORKERS, len(records))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(process_sqs_record, record): record for record in records
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(
+                    f"Error processing SQS record: {futures[future].get('messageId')}",
+                    exc_info=True,
                 )
-                s3_client.download_file(s3_bucket, s3_key, download_path)
 
-                # Instantiate and run the agent for the downloaded file
-                agent = Agent()
-                agent.run(file_path=download_path)
 
-        except Exception as e:
-            logging.error(
-                f"Error processing SQS record: {record.get('messageId')}", exc_info=True
-            )
-            continue
+def initialization_failed():
+    """Returns the response used when a required client failed to initialize."""
+    logging.critical(
+        "A required client (DynamoDB, S3, or model) failed to initialize. Aborting."
+    )
+    return {
+        "statusCode": 500,
+        "body": "A required client (DynamoDB, S3, or model) failed to initialize.",
+    }
 
 
 def lambda_handler(event, context):
-    """Main Lambda function handler."""
+    """
+    Main Lambda function handler. Each route only initializes the clients it
+    needs, so API requests never load the model.
+    """
     logging.info("Lambda handler invoked.")
 
-    if not all([table, s3_client, sess]):
-        logging.critical(
-            "A required client (DynamoDB, S3, or ONNX) failed to initialize. Aborting."
-        )
-        return {
-            "statusCode": 500,
-            "body": "A required client (DynamoDB, S3, or ONNX) failed to initialize.",
-        }
-
     # API Gateway event
     if "httpMethod" in event:
         logging.info("Detected API Gateway event.")
         if event.get("path") == "/alerts" and event.get("httpMethod") == "GET":
+            if get_dynamodb_client() is None:
+                return initialization_failed()
             return get_alerts(event)
         else:
             logging.warning(
                 f"Received unhandled API Gateway request: {event.get('httpMethod')} {event.get('path')}"
             )
-            return {"statusCode": 404, "body": json.dumps({"error": "Not Found"})}
+            return {"statusCode": 404, "body": dumps({"error": "Not Found"})}
 
     # SQS event
     if (
@@ -147,12 +180,16 @@ def lambda_handler(event, context):
         and event["Records"][0]["eventSource"] == "aws:sqs"
     ):
         logging.info("Detected SQS event.")
+        if not all([get_table(), get_s3_client(), get_model()]):
+            return initialization_failed()
         handle_sqs_event(event)
         return {"statusCode": 200, "body": "Processing complete."}
 
     # Local execution
     if RUNNING_LOCALLY:
         logging.info("Detected local execution environment.")
+        if not all([get_table(), get_model()]):
+            return initialization_failed()
         # Instantiate and run the agent for the local file
         agent = Agent()
         agent.run(file_path=LOCAL_CSV_FILE_NAME)
@@ -6,14 +6,65 @@ DYNAMODB_TABLE_NAME = "HighStressUsers"
 # --- AWS Configuration ---
 AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 
+# --- SQS Processing Configuration ---
+# Maximum number of SQS records processed concurrently in one invocation
+SQS_MAX_WORKERS = 10
+
+# --- Resource Configuration ---
+# Resources ship inside the deployment package (the Lambda zip or container
+# image), so they are resolved relative to it rather than the working dir.
+RESOURCES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources"
+)
+
 # --- Model Configuration ---
-MODEL_FILE_NAME = "resources/stress_model.onnx"
+# Set MODEL_FILE_NAME to "resources/stress_model.int8.onnx" to load the
+# quantized model produced by `scripts/quantize_model.py`, or to
+# "resources/stress_model.opt.onnx" to load the pre-optimized graph produced
+# by `scripts/optimize_model.py`, or to "resources/stress_model.ort" to load
+# the ORT format model produced by `scripts/convert_to_ort.py`.
+MODEL_FILE_NAME = os.environ.get(
+    "MODEL_FILE_NAME", os.path.join(RESOURCES_DIR, "stress_model.onnx")
+)
+# "onnx" runs the model through ONNX Runtime, "tree" evaluates the exported
+# decision tree arrays natively (see src/tree.py; install the optional "tree"
+# Pipfile category for the Numba kernel) and "codegen" calls the predictor
+# generated by `scripts/model.py`.
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "onnx")
+TREE_FILE_NAME = os.path.join(RESOURCES_DIR, "stress_tree.npz")
+GENERATED_TREE_FILE_NAME = os.path.join(RESOURCES_DIR, "stress_tree.py")
+# Set USE_GPU=true on GPU hosts with onnxruntime-gpu installed
+USE_GPU = os.environ.get("USE_GPU", "False").lower() == "true"
+# Set USE_TENSORRT=true as well to run supported nodes through TensorRT in
+# FP16. Built engines are cached on disk so warm containers skip the build.
+USE_TENSORRT = os.environ.get("USE_TENSORRT", "False").lower() == "true"
+TRT_ENGINE_CACHE_PATH = os.environ.get("TRT_ENGINE_CACHE_PATH", "/tmp/trt_cache")
+# Set USE_OPENVINO=true on Intel hosts with onnxruntime-openvino installed
+USE_OPENVINO = os.environ.get("USE_OPENVINO", "False").lower() == "true"
+# Defaults to the number of vCPUs available to the function
+ORT_INTRA_OP_NUM_THREADS = int(
+    os.environ.get("ORT_INTRA_OP_NUM_THREADS", os.cpu_count() or 1)
+)
+# Set ORT_CPU_MEM_ARENA=false when the model is loaded before forking worker
+# processes, so that per-worker arena growth doesn't dirty shared pages
+ORT_CPU_MEM_ARENA = os.environ.get("ORT_CPU_MEM_ARENA", "True").lower() == "true"
+# Set DYNAMIC_BATCHING=true to stack predict() calls from concurrent SQS
+# records into one batch (see BatchingModel in src/services.py). A batch is
+# run once it holds BATCH_MAX_SIZE calls or BATCH_MAX_WAIT_MS has passed.
+DYNAMIC_BATCHING = os.environ.get("DYNAMIC_BATCHING", "False").lower() == "true"
+BATCH_MAX_SIZE = 32
+BATCH_MAX_WAIT_MS = 5
+# Set PRELOAD_MODEL=true to load and warm up the model at import time instead
+# of on first use. API requests never use the model, so this is off by default.
+PRELOAD_MODEL = os.environ.get("PRELOAD_MODEL", "False").lower() == "true"
 STRESS_THRESHOLD = 42  # Updated to match the new model's training
 
 # --- Local Development Configuration ---
 # This is checked to determine if the Lambda is running locally
-RUNNING_LOCALLY = os.environ.get("RUNNING_LOCALLY", "False")
-LOCAL_CSV_FILE_NAME = "resources/university_mental_health_iot_dataset.csv"
+RUNNING_LOCALLY = os.environ.get("RUNNING_LOCALLY", "False").lower() == "true"
+LOCAL_CSV_FILE_NAME = os.path.join(
+    RESOURCES_DIR, "university_mental_health_iot_dataset.csv"
+)
 
 # --- Feature Engineering Configuration ---
 NUMERICAL_FEATURES = [
@@ -26,10 +77,17 @@ NUMERICAL_FEATURES = [
     "sleep_hours",
     "mood_score",
 ]
+# Locations seen during training, one-hot encoded in this order
+LOCATION_IDS = [101, 102, 103, 104, 105]
 TRAINING_COLUMNS = NUMERICAL_FEATURES + [
-    "location_id_101",
-    "location_id_102",
-    "location_id_103",
-    "location_id_104",
-    "location_id_105",
+    f"location_id_{location_id}" for location_id in LOCATION_IDS
 ]
+
+# --- CSV Input Configuration ---
+# Only the columns used downstream are read. Features are parsed as float32 to
+# match the ONNX model's input type.
+CSV_COLUMNS = ["timestamp", "location_id", "stress_level"] + NUMERICAL_FEATURES
+CSV_DTYPES = {feature: "float32" for feature in NUMERICAL_FEATURES} | {
+    "location_id": "int16",
+    "stress_level": "float32",
+}
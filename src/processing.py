@@ -2,16 +2,22 @@ import os
 import uuid
 import logging
 from decimal import Decimal
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
 
 # Import shared services and configuration
-from src.services import table, sess, input_name, label_name
+from src.services import get_table, get_model
 from src.config import (
     STRESS_THRESHOLD,
     NUMERICAL_FEATURES,
+    LOCATION_IDS,
     TRAINING_COLUMNS,
     RUNNING_LOCALLY,
+    CSV_COLUMNS,
+    CSV_DTYPES,
 )
 
 # Configure logger
@@ -19,16 +25,40 @@ logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Parse only the input columns, directly into their final types
+CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    include_columns=CSV_COLUMNS,
+    column_types={
+        column: pa.type_for_alias(dtype) for column, dtype in CSV_DTYPES.items()
+    },
+)
+
+LOCATION_ID_ARRAY = np.array(LOCATION_IDS)
+
 
-def load_and_filter_data(file_path):
-    """Loads data from a CSV and filters for potential high-stress records."""
+def load_and_filter_data(file_path, file_obj=None):
+    """
+    Loads data from a CSV and filters for potential high-stress records.
+    The CSV is read from `file_obj` when given (e.g. an S3 object stream),
+    otherwise from `file_path`.
+    """
     try:
         logging.info(f"Attempting to load data from {file_path}.")
-        df = pd.read_csv(file_path, parse_dates=["timestamp"])
-        logging.info(f"Successfully loaded {len(df)} rows from {file_path}.")
-
-        # Pre-filter for users who meet the stress threshold
-        potential_high_stress_df = df[df["stress_level"] > STRESS_THRESHOLD].copy()
+        reader = pa_csv.open_csv(
+            file_obj if file_obj is not None else file_path,
+            convert_options=CSV_CONVERT_OPTIONS,
+        )
+        # Apply the stress threshold filter to each batch as it is read so
+        # rejected rows are never materialized in pandas
+        arrow_table = ds.Scanner.from_batches(
+            reader, filter=pc.field("stress_level") > STRESS_THRESHOLD
+        ).to_table()
+        # Release Arrow buffers as columns are converted so the filtered rows
+        # are not held in memory twice
+        potential_high_stress_df = arrow_table.to_pandas(
+            split_blocks=True, self_destruct=True
+        )
+        del arrow_table
         logging.info(
             f"Found {len(potential_high_stress_df)} records exceeding stress threshold of {STRESS_THRESHOLD}."
         )
@@ -40,76 +70,119 @@ def load_and_filter_data(file_path):
         return None
 
 
+def build_model_input(dataframe):
+    """Builds the float32 (N, num_features) model input for the dataframe."""
+    location_ids = dataframe["location_id"].to_numpy()
+    location_index = np.searchsorted(LOCATION_ID_ARRAY, location_ids)
+
+    # Locations not seen during training keep an all-zero one-hot block
+    is_known = location_index < len(LOCATION_ID_ARRAY)
+    is_known[is_known] = (
+        LOCATION_ID_ARRAY[location_index[is_known]] == location_ids[is_known]
+    )
+    if not is_known.all():
+        logging.warning(
+            f"Found {np.count_nonzero(~is_known)} records with an unknown location_id."
+        )
+
+    # Fill the features and the one-hot block straight into the input matrix,
+    # one column at a time, without intermediate arrays
+    model_input = np.empty((len(dataframe), len(TRAINING_COLUMNS)), dtype=np.float32)
+    for column_index, feature in enumerate(NUMERICAL_FEATURES):
+        model_input[:, column_index] = dataframe[feature].to_numpy()
+    location_onehot = model_input[:, len(NUMERICAL_FEATURES) :]
+    location_onehot.fill(0.0)
+    location_onehot[np.flatnonzero(is_known), location_index[is_known]] = 1.0
+    return model_input
+
+
 def run_inference(dataframe):
-    """Runs model inference on the provided dataframe."""
-    predictions = []
+    """
+    Runs model inference on the provided dataframe in a single batch and
+    returns the subset of rows predicted as high stress.
+    """
     logging.info(f"Starting model inference for {len(dataframe)} records.")
-    for index, row in dataframe.iterrows():
-        try:
-            # Prepare a single row for the model
-            single_row_df = pd.DataFrame([row])
-            location_dummies = pd.get_dummies(
-                single_row_df["location_id"], prefix="location_id", dtype=float
-            )
-            processed_row = pd.concat(
-                [single_row_df[NUMERICAL_FEATURES], location_dummies], axis=1
-            )
-            final_input = processed_row.reindex(columns=TRAINING_COLUMNS, fill_value=0)
-            model_input = final_input.to_numpy().astype(np.float32)
-
-            # Run inference
-            prediction_result = sess.run([label_name], {input_name: model_input})[0][0]
-
-            if prediction_result == 1:
-                predictions.append(row.to_dict())
-        except Exception as e:
-            logging.error(f"Error during inference for row {index}: {e}", exc_info=True)
-            continue
+    try:
+        model_input = build_model_input(dataframe)
+
+        # Run inference over the full (N, num_features) batch
+        model = get_model()
+        if model is None:
+            raise RuntimeError("The stress model is not available.")
+        labels = model.predict(model_input)
+        predictions = dataframe[labels == 1]
+    except Exception as e:
+        logging.error(f"Error during batch inference: {e}", exc_info=True)
+        predictions = dataframe.iloc[0:0]
     logging.info(
         f"Inference complete. Found {len(predictions)} high-stress predictions."
     )
     return predictions
 
 
+def _to_decimals(column):
+    """Converts a numeric column to Decimals rounded to 4 decimal places."""
+    rounded = np.round(column.to_numpy(dtype=np.float64), 4)
+    return [Decimal(repr(value)) for value in rounded.tolist()]
+
+
 def store_predictions(predictions, source_file_path):
-    """Stores the given predictions in DynamoDB."""
+    """Stores the rows of the given predictions dataframe in DynamoDB."""
     items_inserted = 0
     source_filename = os.path.basename(source_file_path)
+    pk = f"SOURCEFILE#{source_filename}"
     logging.info(f"Attempting to store {len(predictions)} predictions in DynamoDB.")
 
-    for row in predictions:
-        try:
-            user_id = str(uuid.uuid4())
-            # Pandas may convert timestamp back to a Timestamp object
-            timestamp_obj = pd.to_datetime(row["timestamp"])
-            timestamp_str = timestamp_obj.strftime("%Y-%m-%d %H:%M:%S")
-
-            pk = f"SOURCEFILE#{source_filename}"
-            sk = f"LOCATION#{row['location_id']}#USERID#{user_id}"
-
-            item = {
-                "PK": pk,
-                "SK": sk,
-                "UserID": user_id,
-                "Timestamp": timestamp_str,
-                "SourceFile": source_filename,
-                "LocationID": int(row["location_id"]),
-                "OriginalStressLevel": Decimal(str(row["stress_level"])),
-                "PredictedStressLabel": 1,
-                "SleepHours": Decimal(str(row["sleep_hours"])),
-                "MoodScore": Decimal(str(row["mood_score"])),
-                "NoiseLevelDB": Decimal(str(row["noise_level_db"])),
-            }
-
-            if not RUNNING_LOCALLY:
-                table.put_item(Item=item)
-            items_inserted += 1
-        except Exception as e:
-            logging.error(
-                f"Failed to store prediction for user {row.get('UserID', 'N/A')}: {e}",
-                exc_info=True,
-            )
-            continue
+    # Format all timestamps in one vectorized call
+    timestamp_strs = predictions["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    # User IDs are derived from the source row rather than drawn at random,
+    # so a redelivered SQS message overwrites the items it already wrote
+    # instead of storing them again. The index is each row's position among
+    # the file's filtered rows, which is the same every time it is processed.
+    user_ids = [
+        str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source_file_path}#{row_index}"))
+        for row_index in predictions.index.tolist()
+    ]
+
+    # Convert whole columns to Python values up front instead of per item
+    rows = zip(
+        user_ids,
+        timestamp_strs.to_numpy(),
+        predictions["location_id"].to_numpy().tolist(),
+        _to_decimals(predictions["stress_level"]),
+        _to_decimals(predictions["sleep_hours"]),
+        _to_decimals(predictions["mood_score"]),
+        _to_decimals(predictions["noise_level_db"]),
+    )
+
+    # The batch writer groups items into BatchWriteItem requests of up to 25
+    # items. Write errors surface when a batch is flushed, which can happen in
+    # any put_item call or on exit, so every error aborts the whole file and
+    # the count is only reported once all batches have been flushed.
+    try:
+        with get_table().batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+            for user_id, timestamp_str, location_id, stress, sleep, mood, noise in rows:
+                item = {
+                    "PK": pk,
+                    "SK": f"LOCATION#{location_id}#USERID#{user_id}",
+                    "UserID": user_id,
+                    "Timestamp": timestamp_str,
+                    "SourceFile": source_filename,
+                    "LocationID": location_id,
+                    "OriginalStressLevel": stress,
+                    "PredictedStressLabel": 1,
+                    "SleepHours": sleep,
+                    "MoodScore": mood,
+                    "NoiseLevelDB": noise,
+                }
+
+                if not RUNNING_LOCALLY:
+                    batch.put_item(Item=item)
+                items_inserted += 1
+    except Exception as e:
+        logging.error(f"Failed to write predictions to DynamoDB: {e}", exc_info=True)
+        raise
 
     logging.info(f"Successfully inserted {items_inserted} records into DynamoDB.")
     return items_inserted
@@ -1,7 +1,51 @@
+import importlib.util
 import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 import boto3
+from botocore.config import Config
+import numpy as np
+from src.config import (
+    AWS_REGION,
+    DYNAMODB_TABLE_NAME,
+    MODEL_FILE_NAME,
+    MODEL_BACKEND,
+    TREE_FILE_NAME,
+    GENERATED_TREE_FILE_NAME,
+    USE_GPU,
+    USE_TENSORRT,
+    TRT_ENGINE_CACHE_PATH,
+    USE_OPENVINO,
+    ORT_INTRA_OP_NUM_THREADS,
+    ORT_CPU_MEM_ARENA,
+    DYNAMIC_BATCHING,
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+    PRELOAD_MODEL,
+)
+
+# OpenMP reads this when onnxruntime is first imported, so it must be set
+# beforehand to keep its thread pool matched to the session's
+os.environ.setdefault("OMP_NUM_THREADS", str(ORT_INTRA_OP_NUM_THREADS))
 import onnxruntime as rt
-from src.config import AWS_REGION, DYNAMODB_TABLE_NAME, MODEL_FILE_NAME
+
+# Sessions run on one process-wide thread pool instead of a private pool
+# each, so any extra session (e.g. a pre- or post-processing graph) doesn't
+# add threads. The sizes only take effect before the first session exists.
+# Once set, ORT rejects sessions that ask for their own threads, so every
+# session in this process must be created with new_session_options().
+rt.set_global_thread_pool_sizes(ORT_INTRA_OP_NUM_THREADS, 1)
+
+
+def new_session_options():
+    """Returns SessionOptions for a session that uses the global thread pool."""
+    sess_options = rt.SessionOptions()
+    sess_options.use_per_session_threads = False
+    return sess_options
+
 
 # --- Configure Logging ---
 # This sets up a basic logger that will print messages to the console.
@@ -10,26 +54,383 @@ logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Clients and the model are created lazily on first use and then cached in
+# module globals, so warm invocations reuse them and code paths that never
+# touch a client (e.g. the API path and the model) don't pay to create it.
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def _get_or_create(name, factory):
+    """
+    Returns the cached instance for `name`, creating it with `factory` on
+    first use. Failed creations (None) are not cached, so they are retried.
+    """
+    instance = _instances.get(name)
+    if instance is None:
+        with _instances_lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = factory()
+                if instance is not None:
+                    _instances[name] = instance
+    return instance
+
+
 # --- Initialize AWS Clients ---
-try:
-    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-    s3_client = boto3.client("s3", region_name=AWS_REGION)
-    table = dynamodb.Table(DYNAMODB_TABLE_NAME)
-    logging.info("Successfully initialized AWS clients.")
-except Exception as e:
-    logging.error(f"Error initializing AWS clients: {e}", exc_info=True)
-    table = None
-    s3_client = None
+# All clients come from one session, so the credential chain and endpoint
+# data are resolved once. A larger connection pool covers concurrent SQS
+# records and batch writes, and TCP keepalive lets warm invocations reuse
+# open HTTPS connections.
+boto_session = boto3.session.Session(region_name=AWS_REGION)
+boto_config = Config(
+    max_pool_connections=50,
+    retries={"max_attempts": 3, "mode": "standard"},
+    tcp_keepalive=True,
+)
+
+
+def _create_table():
+    try:
+        dynamodb = boto_session.resource("dynamodb", config=boto_config)
+        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+        logging.info("Successfully initialized DynamoDB table resource.")
+        return table
+    except Exception as e:
+        logging.error(f"Error initializing DynamoDB table resource: {e}", exc_info=True)
+        return None
+
+
+def _create_dynamodb_client():
+    try:
+        dynamodb_client = boto_session.client("dynamodb", config=boto_config)
+        logging.info("Successfully initialized DynamoDB client.")
+        return dynamodb_client
+    except Exception as e:
+        logging.error(f"Error initializing DynamoDB client: {e}", exc_info=True)
+        return None
+
+
+def _create_s3_client():
+    try:
+        s3_client = boto_session.client("s3", config=boto_config)
+        logging.info("Successfully initialized S3 client.")
+        return s3_client
+    except Exception as e:
+        logging.error(f"Error initializing S3 client: {e}", exc_info=True)
+        return None
+
+
+def get_table():
+    """Returns the DynamoDB table resource, or None if it failed to initialize."""
+    return _get_or_create("table", _create_table)
+
+
+def get_dynamodb_client():
+    """
+    Returns the low-level DynamoDB client used for reads, or None if it failed
+    to initialize. Writes go through the table resource's batch writer.
+    """
+    return _get_or_create("dynamodb_client", _create_dynamodb_client)
+
+
+def get_s3_client():
+    """Returns the S3 client, or None if it failed to initialize."""
+    return _get_or_create("s3_client", _create_s3_client)
+
+
+# Providers that run the model on the GPU
+GPU_PROVIDERS = ("TensorrtExecutionProvider", "CUDAExecutionProvider")
+
+
+def get_execution_providers():
+    """
+    Returns the ONNX Runtime providers to use, in priority order. ORT only
+    uses TensorRT, the GPU or OpenVINO when they are requested explicitly, so
+    they are listed first when enabled and supported by the installed build.
+    """
+    available_providers = rt.get_available_providers()
+    providers = []
+    if USE_TENSORRT:
+        if "TensorrtExecutionProvider" in available_providers:
+            providers.append(
+                (
+                    "TensorrtExecutionProvider",
+                    {
+                        "trt_fp16_enable": True,
+                        "trt_engine_cache_enable": True,
+                        "trt_engine_cache_path": TRT_ENGINE_CACHE_PATH,
+                    },
+                )
+            )
+        else:
+            logging.warning(
+                "USE_TENSORRT is set but TensorrtExecutionProvider is unavailable."
+            )
+    if USE_GPU:
+        if "CUDAExecutionProvider" in available_providers:
+            providers.append("CUDAExecutionProvider")
+        else:
+            logging.warning("USE_GPU is set but CUDAExecutionProvider is unavailable.")
+    if USE_OPENVINO:
+        if "OpenVINOExecutionProvider" in available_providers:
+            providers.append(("OpenVINOExecutionProvider", {"device_type": "CPU"}))
+        else:
+            logging.warning(
+                "USE_OPENVINO is set but OpenVINOExecutionProvider is unavailable."
+            )
+    providers.append("CPUExecutionProvider")
+    return providers
+
+
+class OnnxModel:
+    """
+    Wraps an ONNX Runtime session behind the same predict() interface as the
+    native tree backends.
+    """
+
+    def __init__(self, sess):
+        self.sess = sess
+        self.input_name = sess.get_inputs()[0].name
+        self.label_name = sess.get_outputs()[0].name
+        self.output_names = (self.label_name,)
+        self.on_cuda = sess.get_providers()[0] in GPU_PROVIDERS
+
+    def predict(self, model_input):
+        """Returns the predicted label for each row of a float32 input matrix."""
+        if self.on_cuda:
+            return self._predict_with_io_binding(model_input)
+
+        return self.sess.run(self.output_names, {self.input_name: model_input})[0]
+
+    def warm_up(self):
+        """
+        Runs one prediction on zeros so ORT's kernel setup, memory planning
+        and arena allocation happen now rather than on the first real call.
+        """
+        input_shape = [
+            dim if isinstance(dim, int) else 1
+            for dim in self.sess.get_inputs()[0].shape
+        ]
+        self.predict(np.zeros(input_shape, dtype=np.float32))
+
+    def _predict_with_io_binding(self, model_input):
+        # The input is bound in host memory, so ORT only copies it to the GPU
+        # if a node placed there consumes it. TreeEnsembleClassifier has no
+        # CUDA kernel, so for this model it never leaves the host. The labels
+        # are bound to host memory as well. Bindings are not thread-safe, so
+        # each call gets its own.
+        io_binding = self.sess.io_binding()
+        io_binding.bind_cpu_input(
+            self.input_name, np.ascontiguousarray(model_input, dtype=np.float32)
+        )
+        io_binding.bind_output(self.label_name, "cpu")
+        self.sess.run_with_iobinding(io_binding)
+        return io_binding.copy_outputs_to_cpu()[0]
+
 
 # --- Load the ONNX Model ---
-try:
-    sess = rt.InferenceSession(MODEL_FILE_NAME)
-    input_name = sess.get_inputs()[0].name
-    label_name = sess.get_outputs()[0].name
-    logging.info(f"Successfully loaded ONNX model: {MODEL_FILE_NAME}")
-except FileNotFoundError:
-    logging.error(f"Model file not found at '{MODEL_FILE_NAME}'")
-    sess = None
-except Exception as e:
-    logging.error(f"Error loading ONNX model: {e}", exc_info=True)
-    sess = None
+# ORT's default thread pool oversubscribes the few vCPUs a Lambda gets, so
+# the session uses the global pool sized to the vCPU count above and the
+# graph runs sequentially.
+def _load_onnx_model():
+    try:
+        sess_options = new_session_options()
+        sess_options.execution_mode = rt.ExecutionMode.ORT_SEQUENTIAL
+        # Plan tensor allocations once and serve them from an arena that is
+        # kept across run() calls. The arena is registered with the ORT
+        # environment so it would also be shared by any other session.
+        sess_options.enable_mem_pattern = True
+        sess_options.enable_cpu_mem_arena = ORT_CPU_MEM_ARENA
+        if ORT_CPU_MEM_ARENA:
+            rt.create_and_register_allocator(
+                rt.OrtMemoryInfo(
+                    "Cpu",
+                    rt.OrtAllocatorType.ORT_ARENA_ALLOCATOR,
+                    0,
+                    rt.OrtMemType.DEFAULT,
+                ),
+                rt.OrtArenaCfg(0, -1, -1, -1),
+            )
+            sess_options.add_session_config_entry("session.use_env_allocators", "1")
+        # A graph saved by `scripts/optimize_model.py` or
+        # `scripts/convert_to_ort.py` is already fully optimized, so skip
+        # re-running the optimizers on every cold start
+        if MODEL_FILE_NAME.endswith((".opt.onnx", ".ort")):
+            sess_options.graph_optimization_level = (
+                rt.GraphOptimizationLevel.ORT_DISABLE_ALL
+            )
+        else:
+            sess_options.graph_optimization_level = (
+                rt.GraphOptimizationLevel.ORT_ENABLE_ALL
+            )
+        # ORT-format models are passed in as bytes, which these entries let ORT
+        # use in place, initializers included, instead of copying the model
+        # into its own buffers. They only apply to caller-owned bytes, and
+        # the session keeps the bytes alive. Other models are loaded by path
+        # so external initializer data resolves relative to the model file.
+        if MODEL_FILE_NAME.endswith(".ort"):
+            with open(MODEL_FILE_NAME, "rb") as model_file:
+                model_source = model_file.read()
+            sess_options.add_session_config_entry("session.load_model_format", "ORT")
+            sess_options.add_session_config_entry(
+                "session.use_ort_model_bytes_directly", "1"
+            )
+            sess_options.add_session_config_entry(
+                "session.use_ort_model_bytes_for_initializers", "1"
+            )
+        else:
+            model_source = MODEL_FILE_NAME
+        sess = rt.InferenceSession(
+            model_source,
+            sess_options=sess_options,
+            providers=get_execution_providers(),
+        )
+        logging.info(
+            f"Successfully loaded ONNX model: {MODEL_FILE_NAME} "
+            f"(providers: {sess.get_providers()})"
+        )
+        if (USE_GPU or USE_TENSORRT) and sess.get_providers()[0] not in GPU_PROVIDERS:
+            logging.warning("ONNX session is not running on a GPU provider.")
+        onnx_model = OnnxModel(sess)
+        try:
+            onnx_model.warm_up()
+        except Exception as e:
+            logging.warning(f"ONNX model warm-up failed: {e}", exc_info=True)
+        return onnx_model
+    except FileNotFoundError:
+        logging.error(f"Model file not found at '{MODEL_FILE_NAME}'")
+        return None
+    except Exception as e:
+        logging.error(f"Error loading ONNX model: {e}", exc_info=True)
+        return None
+
+
+# --- Load the Native Decision Tree ---
+# Only imported for the "tree" backend, since importing src.tree compiles the
+# evaluation kernel.
+def _load_tree_model():
+    try:
+        from src.tree import TreeModel
+
+        tree_model = TreeModel(TREE_FILE_NAME)
+        logging.info(f"Successfully loaded decision tree: {TREE_FILE_NAME}")
+        return tree_model
+    except FileNotFoundError:
+        logging.error(f"Tree file not found at '{TREE_FILE_NAME}'")
+        return None
+    except Exception as e:
+        logging.error(f"Error loading decision tree: {e}", exc_info=True)
+        return None
+
+
+# --- Load the Generated Tree Predictor ---
+# For the "codegen" backend the tree is a generated module whose predict()
+# function is used in place of the ONNX session.
+def _load_generated_model():
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "stress_tree", GENERATED_TREE_FILE_NAME
+        )
+        generated_model = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(generated_model)
+        logging.info(
+            f"Successfully loaded generated predictor: {GENERATED_TREE_FILE_NAME}"
+        )
+        return generated_model
+    except FileNotFoundError:
+        logging.error(f"Generated predictor not found at '{GENERATED_TREE_FILE_NAME}'")
+        return None
+    except Exception as e:
+        logging.error(f"Error loading generated predictor: {e}", exc_info=True)
+        return None
+
+
+class BatchingModel:
+    """
+    Wraps a model so that predict() calls made concurrently by SQS worker
+    threads are stacked into one input matrix and run as a single batch by a
+    background thread, then split back into per-call results.
+    """
+
+    def __init__(self, model, max_batch_size, max_wait_ms):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="model-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def predict(self, model_input):
+        """Returns the predicted label for each row of a float32 input matrix."""
+        future = Future()
+        self._requests.put((model_input, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            # Block until a call arrives, then collect more until the batch is
+            # full or the first call has waited max_wait
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        inputs = [model_input for model_input, _ in batch]
+        try:
+            labels = self.model.predict(
+                inputs[0] if len(inputs) == 1 else np.concatenate(inputs)
+            )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        split_points = np.cumsum([len(model_input) for model_input in inputs])[:-1]
+        for (_, future), batch_labels in zip(batch, np.split(labels, split_points)):
+            future.set_result(batch_labels)
+
+
+def _load_model():
+    model = None
+    if MODEL_BACKEND == "tree":
+        model = _load_tree_model()
+    elif MODEL_BACKEND == "codegen":
+        model = _load_generated_model()
+    if model is None:
+        # The ONNX model is the default, and the fallback for the other backends
+        model = _load_onnx_model()
+    if model is not None and DYNAMIC_BATCHING:
+        logging.info(
+            f"Batching predictions (max size: {BATCH_MAX_SIZE}, "
+            f"max wait: {BATCH_MAX_WAIT_MS} ms)"
+        )
+        model = BatchingModel(model, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+    return model
+
+
+def get_model():
+    """
+    Returns the stress model for the configured MODEL_BACKEND, or None if it
+    failed to load. All backends expose predict(model_input).
+
+    When serving from forked worker processes, call this before forking
+    (e.g. gunicorn's preload_app) so the workers share the loaded model's
+    pages copy-on-write, and set ORT_CPU_MEM_ARENA=false.
+    """
+    return _get_or_create("model", _load_model)
+
+
+# Load the model while the module is imported, i.e. during the Lambda INIT
+# phase, so the first SQS invocation doesn't pay for it
+if PRELOAD_MODEL:
+    get_model()
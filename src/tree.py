@@ -0,0 +1,75 @@
+import numpy as np
+
+# Numba is optional; without it the tree is evaluated with NumPy instead.
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # The explicit signature compiles the kernel when this module is imported,
+    # so the first prediction does not pay for JIT compilation. The kernel is
+    # serial: SQS worker threads call it concurrently, which Numba's default
+    # "workqueue" threading layer aborts on, and the tree is too small for
+    # parallel loops to pay off anyway.
+    @njit(
+        "int8[:](float32[:, :], int64[:], float64[:], int64[:], int64[:], int8[:])",
+        cache=True,
+    )
+    def _predict(X, feature, threshold, children_left, children_right, leaf_class):
+        out = np.empty(X.shape[0], np.int8)
+        for i in range(X.shape[0]):
+            node = 0
+            while children_left[node] != -1:
+                if X[i, feature[node]] <= threshold[node]:
+                    node = children_left[node]
+                else:
+                    node = children_right[node]
+            out[i] = leaf_class[node]
+        return out
+
+else:
+
+    def _predict(X, feature, threshold, children_left, children_right, leaf_class):
+        # Advance every row one level down the tree per iteration
+        rows = np.arange(X.shape[0])
+        nodes = np.zeros(X.shape[0], dtype=np.int64)
+        is_split = children_left[nodes] != -1
+        while is_split.any():
+            split_rows = rows[is_split]
+            split_nodes = nodes[is_split]
+            goes_left = X[split_rows, feature[split_nodes]] <= threshold[split_nodes]
+            nodes[is_split] = np.where(
+                goes_left, children_left[split_nodes], children_right[split_nodes]
+            )
+            is_split = children_left[nodes] != -1
+        return leaf_class[nodes]
+
+
+class TreeModel:
+    """
+    A decision tree exported by `scripts/model.py`, evaluated natively
+    instead of through an ONNX Runtime session.
+    """
+
+    def __init__(self, file_path):
+        with np.load(file_path) as arrays:
+            self.feature = arrays["feature"].astype(np.int64)
+            self.threshold = arrays["threshold"].astype(np.float64)
+            self.children_left = arrays["children_left"].astype(np.int64)
+            self.children_right = arrays["children_right"].astype(np.int64)
+            self.leaf_class = arrays["leaf_class"].astype(np.int8)
+
+    def predict(self, model_input):
+        """Returns the predicted label for each row of a float32 input matrix."""
+        return _predict(
+            model_input,
+            self.feature,
+            self.threshold,
+            self.children_left,
+            self.children_right,
+            self.leaf_class,
+        )
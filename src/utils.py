@@ -1,15 +1,41 @@
-import json
 from decimal import Decimal
+import orjson
+from boto3.dynamodb.types import TypeDeserializer
 
 
-class DecimalEncoder(json.JSONEncoder):
-    """Helper class to convert a DynamoDB item's Decimal types to JSON."""
+def decimal_to_number(o):
+    """Converts a Decimal to int if it is integral (e.g. 54.0), else float."""
+    if o == o.to_integral_value():
+        return int(o)
+    return float(o)
 
-    def default(self, o):
-        if isinstance(o, Decimal):
-            # Check if it's a float or int
-            if o % 1 > 0:
-                return float(o)
-            else:
-                return int(o)
-        return super(DecimalEncoder, self).default(o)
+
+def _decimal_default(o):
+    if isinstance(o, Decimal):
+        return decimal_to_number(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps(obj, option=None):
+    """Serializes `obj` to a JSON string with orjson, handling Decimals."""
+    return orjson.dumps(obj, default=_decimal_default, option=option).decode()
+
+
+class PlainTypeDeserializer(TypeDeserializer):
+    """
+    Helper class to deserialize low-level DynamoDB items with numbers as
+    int or float instead of Decimal, so they serialize to JSON directly.
+    """
+
+    def _deserialize_n(self, value):
+        if "." in value or "e" in value or "E" in value:
+            return float(value)
+        return int(value)
+
+
+_deserializer = PlainTypeDeserializer()
+
+
+def deserialize_item(item):
+    """Converts a low-level DynamoDB item into a plain Python dict."""
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}